@@ -0,0 +1,7 @@
+import os
+
+# The examples only read the layer graph for drawing and never run a forward pass, so skip the expensive GPU/CUDA
+# initialization and silence the TF startup logging. Must be imported before tensorflow.
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '0')
@@ -0,0 +1,106 @@
+import functools
+
+from tensorflow import keras
+from tensorflow.keras import layers
+from tensorflow.python.keras.models import Sequential
+from tensorflow.python.keras.layers import Dense, Flatten, Conv2D, Dropout, MaxPooling2D, InputLayer, ZeroPadding2D
+
+import visualkeras
+
+
+@functools.lru_cache(maxsize=None)
+def vgg16(image_size: int = 224, spacing_layers: bool = True):
+    """
+    Builds the VGG16 topology shared by the example scripts. The model is only used to extract the layer graph for
+    drawing, so it is constructed once per flag combination and cached.
+
+    :param image_size: Width and height of the input image.
+    :param spacing_layers: If True, a SpacingDummyLayer is inserted after each block to allow spaced rendering.
+
+    :return: A Sequential VGG16 model.
+    """
+    model = Sequential()
+    model.add(InputLayer(input_shape=(image_size, image_size, 3)))
+
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(64, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(64, activation='relu', kernel_size=(3, 3)))
+    if spacing_layers:
+        model.add(visualkeras.SpacingDummyLayer())
+
+    model.add(MaxPooling2D((2, 2), strides=(2, 2)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(128, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(128, activation='relu', kernel_size=(3, 3)))
+    if spacing_layers:
+        model.add(visualkeras.SpacingDummyLayer())
+
+    model.add(MaxPooling2D((2, 2), strides=(2, 2)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
+    if spacing_layers:
+        model.add(visualkeras.SpacingDummyLayer())
+
+    model.add(MaxPooling2D((2, 2), strides=(2, 2)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
+    if spacing_layers:
+        model.add(visualkeras.SpacingDummyLayer())
+
+    model.add(MaxPooling2D((2, 2), strides=(2, 2)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
+    model.add(ZeroPadding2D((1, 1)))
+    model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
+    model.add(MaxPooling2D())
+    if spacing_layers:
+        model.add(visualkeras.SpacingDummyLayer())
+
+    model.add(Flatten())
+
+    model.add(Dense(4096, activation='relu'))
+    model.add(Dropout(0.5))
+    model.add(Dense(4096, activation='relu'))
+    model.add(Dropout(0.5))
+    model.add(Dense(1000, activation='softmax'))
+
+    return model
+
+@functools.lru_cache(maxsize=None)
+def build_autoencoder():
+    """
+    Builds the convolutional encoder/decoder pair used by the autoencoder example. Built once and cached, so both
+    figures (and any other script) share a single Keras graph.
+
+    :return: Tuple of (encoder, autoencoder) functional models.
+    """
+    encoder_input = keras.Input(shape=(28, 28, 1), name='img')
+    x = layers.Conv2D(16, 3, activation='relu')(encoder_input)
+    x = layers.Conv2D(32, 3, activation='relu')(x)
+    x = layers.MaxPooling2D(3)(x)
+    x = layers.Conv2D(32, 3, activation='relu')(x)
+    x = layers.Conv2D(16, 3, activation='relu')(x)
+    encoder_output = layers.GlobalMaxPooling2D()(x)
+    encoder = keras.Model(encoder_input, encoder_output, name='encoder')
+
+    x = layers.Reshape((4, 4, 1))(encoder_output)
+    x = layers.Conv2DTranspose(16, 3, activation='relu')(x)
+    x = layers.Conv2DTranspose(32, 3, activation='relu')(x)
+    x = layers.UpSampling2D(3)(x)
+    x = layers.Conv2DTranspose(16, 3, activation='relu')(x)
+    decoder_output = layers.Conv2DTranspose(1, 3, activation='relu')(x)
+    autoencoder = keras.Model(encoder_input, decoder_output, name='autoencoder')
+
+    return encoder, autoencoder
@@ -1,25 +1,16 @@
-from tensorflow import keras
-from tensorflow.keras import layers
+try:
+    from examples import _bootstrap  # noqa: F401  # must run before tensorflow is imported
+except ImportError:
+    import _bootstrap  # noqa: F401
 import visualkeras
 
+try:
+    from examples._models import build_autoencoder
+except ImportError:
+    from _models import build_autoencoder
 
-encoder_input = keras.Input(shape=(28, 28, 1), name='img')
-x = layers.Conv2D(16, 3, activation='relu')(encoder_input)
-x = layers.Conv2D(32, 3, activation='relu')(x)
-x = layers.MaxPooling2D(3)(x)
-x = layers.Conv2D(32, 3, activation='relu')(x)
-x = layers.Conv2D(16, 3, activation='relu')(x)
-encoder_output = layers.GlobalMaxPooling2D()(x)
-encoder = keras.Model(encoder_input, encoder_output, name='encoder')
 
-visualkeras.layered_view(encoder, to_file='../figures/encoder.png')
+encoder, autoencoder = build_autoencoder()
 
-x = layers.Reshape((4, 4, 1))(encoder_output)
-x = layers.Conv2DTranspose(16, 3, activation='relu')(x)
-x = layers.Conv2DTranspose(32, 3, activation='relu')(x)
-x = layers.UpSampling2D(3)(x)
-x = layers.Conv2DTranspose(16, 3, activation='relu')(x)
-decoder_output = layers.Conv2DTranspose(1, 3, activation='relu')(x)
-autoencoder = keras.Model(encoder_input, decoder_output, name='autoencoder')
-
-visualkeras.layered_view(autoencoder, to_file='../figures/autoencoder.png')
\ No newline at end of file
+visualkeras.layered_view(encoder, to_file='../figures/encoder.png', png_compress_level=1)
+visualkeras.layered_view(autoencoder, to_file='../figures/autoencoder.png', png_compress_level=1)
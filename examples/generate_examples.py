@@ -1,3 +1,7 @@
+try:
+    from examples import _bootstrap  # noqa: F401  # must run before tensorflow is imported
+except ImportError:
+    import _bootstrap  # noqa: F401
 from examples import dense
 from examples import vgg16
 from examples import autoencoder
\ No newline at end of file
@@ -1,84 +1,63 @@
-from tensorflow.python.keras.models import Sequential
-from tensorflow.python.keras.layers import Dense, Flatten, Conv2D, Dropout, MaxPooling2D, InputLayer, ZeroPadding2D
-from collections import defaultdict
-import visualkeras
-from PIL import ImageFont
-
-# create VGG16
-image_size = 224
-model = Sequential()
-model.add(InputLayer(input_shape=(image_size, image_size, 3)))
-
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(64, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(64, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(128, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(128, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
+try:
+    from examples import _bootstrap  # noqa: F401  # must run before tensorflow is imported
+except ImportError:
+    import _bootstrap  # noqa: F401
+from tensorflow.python.keras.layers import Dense, Flatten, Conv2D, Dropout, MaxPooling2D, ZeroPadding2D
+
+try:
+    from examples._models import vgg16
+except ImportError:
+    from _models import vgg16
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(MaxPooling2D())
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(Flatten())
+import visualkeras
+from visualkeras.layered import _build_layer_ir
 
-model.add(Dense(4096, activation='relu'))
-model.add(Dropout(0.5))
-model.add(Dense(4096, activation='relu'))
-model.add(Dropout(0.5))
-model.add(Dense(1000, activation='softmax'))
+# create VGG16 (shared, cached across example scripts)
+model = vgg16()
 
 # Now visualize the model!
 
-color_map = defaultdict(dict)
-color_map[Conv2D]['fill'] = 'orange'
-color_map[ZeroPadding2D]['fill'] = 'gray'
-color_map[Dropout]['fill'] = 'pink'
-color_map[MaxPooling2D]['fill'] = 'red'
-color_map[Dense]['fill'] = 'green'
-color_map[Flatten]['fill'] = 'teal'
-
-font = ImageFont.truetype("arial.ttf", 32)
-
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_show_dimension.png', type_ignore=[visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_legend_show_dimension.png', type_ignore=[visualkeras.SpacingDummyLayer]
-                         , font=font)
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_spacing_layers_show_dimension.png', spacing=0)
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_type_ignore_show_dimension.png',
-                         type_ignore=[ZeroPadding2D, Dropout, Flatten, visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_color_map_show_dimension.png',
-                         color_map=color_map, type_ignore=[visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_flat_show_dimension.png',
-                         draw_volume=False, type_ignore=[visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, legend=True, show_dimension=True, to_file='../figures/vgg16_scaling_show_dimension.png',
-                         scale_xy=1, scale_z=1, max_z=1000, type_ignore=[visualkeras.SpacingDummyLayer])
\ No newline at end of file
+color_map = {
+    Conv2D: {'fill': 'orange'},
+    ZeroPadding2D: {'fill': 'gray'},
+    Dropout: {'fill': 'pink'},
+    MaxPooling2D: {'fill': 'red'},
+    Dense: {'fill': 'green'},
+    Flatten: {'fill': 'teal'},
+}
+
+font = visualkeras.get_font("arial.ttf", 32)
+
+# Walk the model once and share the geometry between all renders that use the same scaling and ignore parameters
+layer_ir = _build_layer_ir(model, type_ignore=[visualkeras.SpacingDummyLayer])
+
+configs = [
+    dict(to_file='../figures/vgg16_show_dimension.png', png_compress_level=1, layer_ir=layer_ir),
+    dict(to_file='../figures/vgg16_legend_show_dimension.png', png_compress_level=1, layer_ir=layer_ir, font=font),
+    dict(to_file='../figures/vgg16_spacing_layers_show_dimension.png', png_compress_level=1, spacing=0),
+    dict(to_file='../figures/vgg16_type_ignore_show_dimension.png', png_compress_level=1,
+         type_ignore=[ZeroPadding2D, Dropout, Flatten, visualkeras.SpacingDummyLayer]),
+    dict(to_file='../figures/vgg16_color_map_show_dimension.png', png_compress_level=1, color_map=color_map, layer_ir=layer_ir),
+    dict(to_file='../figures/vgg16_flat_show_dimension.png', png_compress_level=1, draw_volume=False, layer_ir=layer_ir),
+    dict(to_file='../figures/vgg16_scaling_show_dimension.png', png_compress_level=1,
+         scale_xy=1, scale_z=1, max_z=1000, type_ignore=[visualkeras.SpacingDummyLayer]),
+]
+
+
+def render(index):
+    # Workers only receive the index; the model, IR and configs are inherited through fork instead of pickled
+    visualkeras.layered_view(model, legend=True, show_dimension=True, **configs[index])
+
+
+if __name__ == '__main__':
+    # The renders are independent and CPU bound, so fan them out over processes where fork is available
+    if 'fork' in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=min(len(configs), os.cpu_count()), mp_context=ctx) as ex:
+            list(ex.map(render, range(len(configs))))
+    else:
+        for i in range(len(configs)):
+            render(i)
\ No newline at end of file
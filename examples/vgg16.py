@@ -1,84 +1,40 @@
-from tensorflow.python.keras.models import Sequential
-from tensorflow.python.keras.layers import Dense, Flatten, Conv2D, Dropout, MaxPooling2D, InputLayer, ZeroPadding2D
-from collections import defaultdict
+try:
+    from examples import _bootstrap  # noqa: F401  # must run before tensorflow is imported
+except ImportError:
+    import _bootstrap  # noqa: F401
+from tensorflow.python.keras.layers import Dense, Flatten, Conv2D, Dropout, MaxPooling2D, ZeroPadding2D
+
+try:
+    from examples._models import vgg16
+except ImportError:
+    from _models import vgg16
 import visualkeras
-from PIL import ImageFont
 
-# create VGG16
-image_size = 224
-model = Sequential()
-model.add(InputLayer(input_shape=(image_size, image_size, 3)))
-
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(64, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(64, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(128, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(128, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(256, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(MaxPooling2D((2, 2), strides=(2, 2)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(ZeroPadding2D((1, 1)))
-model.add(Conv2D(512, activation='relu', kernel_size=(3, 3)))
-model.add(MaxPooling2D())
-model.add(visualkeras.SpacingDummyLayer())
-
-model.add(Flatten())
-
-model.add(Dense(4096, activation='relu'))
-model.add(Dropout(0.5))
-model.add(Dense(4096, activation='relu'))
-model.add(Dropout(0.5))
-model.add(Dense(1000, activation='softmax'))
+# create VGG16 (shared, cached across example scripts)
+model = vgg16()
 
 # Now visualize the model!
 
-color_map = defaultdict(dict)
-color_map[Conv2D]['fill'] = 'orange'
-color_map[ZeroPadding2D]['fill'] = 'gray'
-color_map[Dropout]['fill'] = 'pink'
-color_map[MaxPooling2D]['fill'] = 'red'
-color_map[Dense]['fill'] = 'green'
-color_map[Flatten]['fill'] = 'teal'
+color_map = {
+    Conv2D: {'fill': 'orange'},
+    ZeroPadding2D: {'fill': 'gray'},
+    Dropout: {'fill': 'pink'},
+    MaxPooling2D: {'fill': 'red'},
+    Dense: {'fill': 'green'},
+    Flatten: {'fill': 'teal'},
+}
 
-font = ImageFont.truetype("arial.ttf", 32)
+font = visualkeras.get_font("arial.ttf", 32)
 
-visualkeras.layered_view(model, to_file='../figures/vgg16.png', type_ignore=[visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, to_file='../figures/vgg16_legend.png', type_ignore=[visualkeras.SpacingDummyLayer],
+visualkeras.layered_view(model, to_file='../figures/vgg16.png', png_compress_level=1, type_ignore=[visualkeras.SpacingDummyLayer])
+visualkeras.layered_view(model, to_file='../figures/vgg16_legend.png', png_compress_level=1, type_ignore=[visualkeras.SpacingDummyLayer],
                          legend=True, font=font)
-visualkeras.layered_view(model, to_file='../figures/vgg16_spacing_layers.png', spacing=0)
-visualkeras.layered_view(model, to_file='../figures/vgg16_type_ignore.png',
+visualkeras.layered_view(model, to_file='../figures/vgg16_spacing_layers.png', png_compress_level=1, spacing=0)
+visualkeras.layered_view(model, to_file='../figures/vgg16_type_ignore.png', png_compress_level=1,
                          type_ignore=[ZeroPadding2D, Dropout, Flatten, visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, to_file='../figures/vgg16_color_map.png',
+visualkeras.layered_view(model, to_file='../figures/vgg16_color_map.png', png_compress_level=1,
                          color_map=color_map, type_ignore=[visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, to_file='../figures/vgg16_flat.png',
+visualkeras.layered_view(model, to_file='../figures/vgg16_flat.png', png_compress_level=1,
                          draw_volume=False, type_ignore=[visualkeras.SpacingDummyLayer])
-visualkeras.layered_view(model, to_file='../figures/vgg16_scaling.png',
+visualkeras.layered_view(model, to_file='../figures/vgg16_scaling.png', png_compress_level=1,
                          scale_xy=1, scale_z=1, max_z=1000, type_ignore=[visualkeras.SpacingDummyLayer])
@@ -1,3 +1,5 @@
+import functools
+
 import pytest
 
 try:
@@ -146,22 +148,28 @@ def functional_model(request):
 
 
 def _get_models(request):
-    if request.param == "functional_model_tf":
+    return _build_model(request.param)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_model(param):
+    # The views only read the models, so each parametrization is built once per session instead of per test
+    if param == "functional_model_tf":
         return get_functional_model(tf.keras)
-    elif request.param == "functional_model_keras":
+    elif param == "functional_model_keras":
         return get_functional_model(keras)
-    elif request.param == "sequential_model_tf":
+    elif param == "sequential_model_tf":
         return get_sequential_model(tf.keras)
-    elif request.param == "sequential_model_keras":
+    elif param == "sequential_model_keras":
         return get_sequential_model(keras)
 
-    elif request.param == "functional_model_tf_with_nested":
+    elif param == "functional_model_tf_with_nested":
         return get_functional_model_with_nested(tf.keras)
-    elif request.param == "functional_model_keras_with_nested":
+    elif param == "functional_model_keras_with_nested":
         return get_functional_model_with_nested(keras)
-    elif request.param == "sequential_model_tf_with_nested":
+    elif param == "sequential_model_tf_with_nested":
         return get_sequential_model_with_nested(tf.keras)
-    elif request.param == "sequential_model_keras_with_nested":
+    elif param == "sequential_model_keras_with_nested":
         return get_sequential_model_with_nested(keras)
 
     else:
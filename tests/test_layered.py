@@ -1,5 +1,10 @@
-from visualkeras.layered import layered_view
+from visualkeras.layered import layered_view, _build_layer_ir
 
 
 def test_graph_view(model):
-    layered_view(model)
\ No newline at end of file
+    layered_view(model)
+
+
+def test_precomputed_layer_ir(model):
+    ir = _build_layer_ir(model)
+    assert layered_view(model, layer_ir=ir).tobytes() == layered_view(model).tobytes()
\ No newline at end of file
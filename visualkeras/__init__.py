@@ -1,2 +1,11 @@
 from visualkeras.layered import *
 from visualkeras.graph import *
+
+
+def __getattr__(name):
+    # SpacingDummyLayer is created lazily in layer_utils to avoid importing tensorflow/keras at package import.
+    if name == 'SpacingDummyLayer':
+        from visualkeras.layer_utils import SpacingDummyLayer
+        globals()['SpacingDummyLayer'] = SpacingDummyLayer
+        return SpacingDummyLayer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
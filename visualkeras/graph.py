@@ -1,10 +1,31 @@
 import aggdraw
+import functools
+import numpy as np
 from PIL import Image, ImageDraw
 from math import ceil
 from .utils import *
+from .utils import _get_pen
 from .layer_utils import *
 
 
+_EMPTY_STYLE = dict()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_node_tile(node_cls: type, fill: tuple, outline: tuple, width: int, height: int) -> Image:
+    # Nodes of the same kind, style and size render identically, so rasterize each combination once on a transparent
+    # tile and stamp it wherever needed instead of issuing an antialiased draw call per node.
+    tile = Image.new('RGBA', (width + 1, height + 1), (0, 0, 0, 0))
+    tile_draw = aggdraw.Draw(tile)
+    shape = node_cls()
+    shape.x1, shape.y1, shape.x2, shape.y2 = 0, 0, width, height
+    shape._fill = fill
+    shape._outline = outline
+    shape.draw(tile_draw)
+    tile_draw.flush()
+    return tile
+
+
 class _DummyLayer:
 
     def __init__(self, name, units=None):
@@ -72,8 +93,8 @@ def graph_view(model, to_file: str = None,
 
     # Attach helper layers
 
-    id_to_num_mapping, adj_matrix = model_to_adj_matrix(model)
-    model_layers = model_to_hierarchy_lists(model, id_to_num_mapping, adj_matrix)
+    id_to_num_mapping, edges = model_to_adj_matrix(model)
+    model_layers = model_to_hierarchy_lists(model, id_to_num_mapping, edges)
 
     # Add fake output layers
     model_layers.append([
@@ -83,13 +104,14 @@ def graph_view(model, to_file: str = None,
         )
         for i in range(len(model.outputs))
     ])
-    id_to_num_mapping, adj_matrix = augment_output_layers(model, model_layers[-1], id_to_num_mapping, adj_matrix)
+    id_to_num_mapping, edges = augment_output_layers(model, model_layers[-1], id_to_num_mapping, edges)
 
     # Create architecture
 
     current_x = padding  # + input_label_size[0] + text_padding
 
     id_to_node_list_map = dict()
+    id_to_layer_row = dict()
 
     for index, layer_list in enumerate(model_layers):
         current_y = 0
@@ -113,8 +135,16 @@ def graph_view(model, to_file: str = None,
             n = min(units, ellipsize_after)
             layer_nodes = list()
 
+            style = color_map.get(type(layer), _EMPTY_STYLE)
+            fill = style.get('fill', 'orange')
+            outline = style.get('outline', 'black')
+
+            # All nodes of a layer share one height, so their positions form an arithmetic progression
+            height = node_size * (3 if is_box else 1)
+            step = height + node_spacing
+            x2 = current_x + node_size
+
             for i in range(n):
-                scale = 1
                 if not is_box:
                     if i != ellipsize_after - 2:
                         c = Circle()
@@ -122,21 +152,21 @@ def graph_view(model, to_file: str = None,
                         c = Ellipses()
                 else:
                     c = Box()
-                    scale = 3
 
                 c.x1 = current_x
-                c.y1 = current_y
-                c.x2 = c.x1 + node_size
-                c.y2 = c.y1 + node_size * scale
+                c.y1 = current_y + i * step
+                c.x2 = x2
+                c.y2 = c.y1 + height
 
-                current_y = c.y2 + node_spacing
-
-                c.fill = color_map.get(type(layer), {}).get('fill', 'orange')
-                c.outline = color_map.get(type(layer), {}).get('outline', 'black')
+                c.fill = fill
+                c.outline = outline
 
                 layer_nodes.append(c)
 
+            current_y += n * step
+
             id_to_node_list_map[id(layer)] = layer_nodes
+            id_to_layer_row[id(layer)] = index
             nodes.extend(layer_nodes)
             current_y += 2 * node_size
 
@@ -147,47 +177,67 @@ def graph_view(model, to_file: str = None,
     # Generate image
 
     img_width = len(layers) * node_size + (len(layers) - 1) * layer_spacing + 2 * padding
-    img_height = max(*layer_y) + 2 * padding
-    img = Image.new('RGBA', (int(ceil(img_width)), int(ceil(img_height))), background_fill)
+    img_height = max(layer_y) + 2 * padding
+    # Fill the canvas through a numpy buffer, which memsets large backgrounds faster than Image.new's fill
+    buf = np.empty((int(ceil(img_height)), int(ceil(img_width)), 4), dtype=np.uint8)
+    buf[:] = get_rgba_tuple(background_fill)
+    img = Image.fromarray(buf, 'RGBA')
 
     draw = aggdraw.Draw(img)
 
-    # y correction (centering)
-    for i, layer in enumerate(layers):
-        y_off = (img.height - layer_y[i]) / 2
-        for node in layer:
-            node.y1 += y_off
-            node.y2 += y_off
-
-    for start_idx, end_idx in zip(*np.where(adj_matrix > 0)):
-        start_id = next(get_keys_by_value(id_to_num_mapping, start_idx))
-        end_id = next(get_keys_by_value(id_to_num_mapping, end_idx))
-
-        start_layer_list = id_to_node_list_map[start_id]
-        end_layer_list = id_to_node_list_map[end_id]
+    # y correction (centering) per layer column, applied lazily below so the node lists are only walked once
+    y_offs = [(img.height - y) / 2 for y in layer_y]
+
+    # Collect all connectors into one aggdraw path, so a single pen and draw call covers every edge
+    pen = _get_pen(get_rgba_tuple(connector_fill), connector_width)
+    path = aggdraw.Path()
+
+    # Precompute the connector endpoints (centered, and with ellipses dropped) once per layer instead of once per
+    # edge pair
+    start_points_map = dict()
+    end_points_map = dict()
+    for layer_id, node_list in id_to_node_list_map.items():
+        y_off = y_offs[id_to_layer_row[layer_id]]
+        connectable = [(node.x1, node.x2, y_off + node.y1 + (node.y2 - node.y1) / 2)
+                       for node in node_list if not isinstance(node, Ellipses)]
+        start_points_map[layer_id] = [(x2, y_mid) for _, x2, y_mid in connectable]
+        end_points_map[layer_id] = [(x1, y_mid) for x1, _, y_mid in connectable]
+
+    # Reverse index for O(1) edge lookups instead of a linear scan per edge
+    num_to_id = {v: k for k, v in id_to_num_mapping.items()}
+
+    # The edge list is emitted grouped by target layer, so consecutive edges usually share an endpoint list; keep
+    # the previous lookups around instead of re-resolving them per edge
+    prev_start_idx = prev_end_idx = None
+    start_points = end_points = None
+    for start_idx, end_idx in edges:
+        if start_idx != prev_start_idx:
+            start_points = start_points_map[num_to_id[start_idx]]
+            prev_start_idx = start_idx
+        if end_idx != prev_end_idx:
+            end_points = end_points_map[num_to_id[end_idx]]
+            prev_end_idx = end_idx
 
         # draw connectors
-        for start_node_idx, start_node in enumerate(start_layer_list):
-            for end_node in end_layer_list:
-                if not isinstance(start_node, Ellipses) and not isinstance(end_node, Ellipses):
-                    _draw_connector(draw, start_node, end_node, color=connector_fill, width=connector_width)
-
-    for i, layer in enumerate(layers):
-        for node_index, node in enumerate(layer):
-            node.draw(draw)
+        for start_x, start_y in start_points:
+            for end_x, end_y in end_points:
+                path.moveto(start_x, start_y)
+                path.lineto(end_x, end_y)
 
+    draw.path(path, pen)
     draw.flush()
 
+    # Center and stamp the nodes in a single traversal, reusing one pre-rendered tile per node kind and style
+    for i, layer in enumerate(layers):
+        y_off = y_offs[i]
+        for node in layer:
+            node.y1 += y_off
+            node.y2 += y_off
+            tile = _get_node_tile(type(node), node.fill, node.outline,
+                                  int(node.x2 - node.x1), int(node.y2 - node.y1))
+            img.paste(tile, (int(node.x1), int(node.y1)), tile)
+
     if to_file is not None:
         img.save(to_file)
 
     return img
-
-
-def _draw_connector(draw, start_node, end_node, color, width):
-    pen = aggdraw.Pen(color, width)
-    x1 = start_node.x2
-    y1 = start_node.y1 + (start_node.y2 - start_node.y1) / 2
-    x2 = end_node.x1
-    y2 = end_node.y1 + (end_node.y2 - end_node.y1) / 2
-    draw.line([x1, y1, x2, y2], pen)
\ No newline at end of file
@@ -1,118 +1,189 @@
-import numpy as np
-from .utils import get_keys_by_value
+import operator
+import weakref
+from collections import deque
 from collections.abc import Iterable
 
-try:
-    from tensorflow.keras.layers import Layer
-except ModuleNotFoundError:
+_layer_index_cache = weakref.WeakKeyDictionary()
+_adjacency_cache = weakref.WeakKeyDictionary()
+_layers_attr_cache = dict()
+
+def _create_spacing_dummy_layer():
     try:
-        from keras.layers import Layer
+        from tensorflow.keras.layers import Layer
     except ModuleNotFoundError:
-        pass
+        from keras.layers import Layer
+
+    class SpacingDummyLayer(Layer):
 
+        def __init__(self, spacing: int = 50):
+            super().__init__()
+            self.spacing = spacing
 
-class SpacingDummyLayer(Layer):
+    return SpacingDummyLayer
 
-    def __init__(self, spacing: int = 50):
-        super().__init__()
-        self.spacing = spacing
+
+def __getattr__(name):
+    # Defer the tensorflow/keras import until the layer class is actually used, so that `import visualkeras`
+    # stays fast for users that only want to draw an already built model.
+    if name == 'SpacingDummyLayer':
+        cls = _create_spacing_dummy_layer()
+        globals()['SpacingDummyLayer'] = cls
+        return cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _model_layers(model):
+    # Single place for the version-dependent layer list access. The hasattr ladder runs once per model class;
+    # afterwards the access is a dict lookup plus a C-level attrgetter.
+    getter = _layers_attr_cache.get(type(model))
+    if getter is None:
+        if hasattr(model, '_layers'):
+            getter = operator.attrgetter('_layers')
+        elif hasattr(model, '_self_tracked_trackables'):
+            getter = operator.attrgetter('_self_tracked_trackables')
+        else:
+            return []
+        _layers_attr_cache[type(model)] = getter
+    return getter(model)
 
 
 def get_incoming_layers(layer):
-    for i, node in enumerate(layer._inbound_nodes):
+    incoming = list()
+    for node in layer._inbound_nodes:
         if hasattr(node, 'inbound_layers'):
             # Old Node class (TF 2.15 & Keras 2.15 and under)
-            if isinstance(node.inbound_layers, Iterable):
-                for inbound_layer in node.inbound_layers:
-                    yield inbound_layer
+            inbound_layers = node.inbound_layers
+            # Exact-type check first; the ABC isinstance walks the registration machinery
+            if type(inbound_layers) is list or type(inbound_layers) is tuple \
+                    or isinstance(inbound_layers, Iterable):
+                incoming.extend(inbound_layers)
             else:  # For older versions like TF 2.3
-                yield node.inbound_layers
+                incoming.append(inbound_layers)
         else:
             # New Node class (TF 2.16 and Keras 3 and up)
-            inbound_layers = [parent_node.operation for parent_node in node.parent_nodes]
-            if isinstance(inbound_layers, Iterable):
-                for inbound_layer in inbound_layers:
-                    yield inbound_layer
-            else:
-                yield inbound_layers
+            incoming.extend(parent_node.operation for parent_node in node.parent_nodes)
+    return incoming
 
 
 def get_outgoing_layers(layer):
-    for i, node in enumerate(layer._outbound_nodes):
+    for node in layer._outbound_nodes:
         yield node.outbound_layer
 
 
+def build_layer_graph(model):
+    """
+    Materializes the incoming and outgoing adjacency of all model layers in a single pass, so that traversals do not
+    have to re-walk the keras node structures per query.
+
+    :param model: A keras model.
+    :return: Tuple of ({id(layer): [incoming layers]}, {id(layer): [outgoing layers]}).
+    """
+    layers = _model_layers(model)
+
+    inbound = dict()
+    outbound = dict()
+    for layer in layers:
+        inbound[id(layer)] = get_incoming_layers(layer)
+        outbound.setdefault(id(layer), list())
+    # Derive the outgoing side by reversing the incoming edges, which avoids relying on _outbound_nodes internals
+    for layer in layers:
+        for incoming_layer in inbound[id(layer)]:
+            outbound.setdefault(id(incoming_layer), list()).append(layer)
+    return inbound, outbound
+
+
 def model_to_adj_matrix(model):
+    """
+    Extracts the layer connectivity of a model as a sparse edge list. Keras models connect each layer to only a
+    handful of others, so the edges are kept as (src, dst) index pairs instead of a dense V x V matrix: memory goes
+    from O(V^2) to O(E) and consumers can iterate the edges directly without scanning the matrix for non-zeros.
+
+    :param model: A keras model.
+    :return: Tuple of ({id(layer): index}, [(src_index, dst_index), ...]) with duplicate edges removed.
+    """
     if hasattr(model, 'built'):
         if not model.built:
             model.build()
-            
-    layers = []
-    if hasattr(model, '_layers'):
-        layers = model._layers
-    elif hasattr(model, '_self_tracked_trackables'):
-        layers = model._self_tracked_trackables
-
-    adj_matrix = np.zeros((len(layers), len(layers)))
+
+    layers = _model_layers(model)
+
+    # Several helpers call this per render; reuse the result as long as the layer count is unchanged. Copies are
+    # returned because augment_output_layers extends both structures with dummy output nodes.
+    try:
+        cached = _adjacency_cache.get(model)
+    except TypeError:  # model does not support weak references
+        cached = None
+    if cached is not None and cached[0] == len(layers):
+        return dict(cached[1]), list(cached[2])
+
+    edges = list()
+    seen_edges = set()
     id_to_num_mapping = dict()
 
     for layer in layers:
-        layer_id = id(layer)
-        if layer_id not in id_to_num_mapping:
-            id_to_num_mapping[layer_id] = len(id_to_num_mapping.keys())
+        # setdefault hashes the key once for the lookup and the insert combined
+        tgt = id_to_num_mapping.setdefault(id(layer), len(id_to_num_mapping))
 
         for inbound_layer in get_incoming_layers(layer):
-            inbound_layer_id = id(inbound_layer)
+            src = id_to_num_mapping.setdefault(id(inbound_layer), len(id_to_num_mapping))
 
-            if inbound_layer_id not in id_to_num_mapping:
-                id_to_num_mapping[inbound_layer_id] = len(id_to_num_mapping.keys())
+            edge = (src, tgt)
+            if edge not in seen_edges:
+                seen_edges.add(edge)
+                edges.append(edge)
+
+    try:
+        _adjacency_cache[model] = (len(layers), id_to_num_mapping, edges)
+    except TypeError:
+        pass
+    return dict(id_to_num_mapping), list(edges)
 
-            src = id_to_num_mapping[inbound_layer_id]
-            tgt = id_to_num_mapping[layer_id]
-            adj_matrix[src, tgt] += 1
 
-    return id_to_num_mapping, adj_matrix
+def _layer_index(model):
+    # Builds {id: layer} and {name: layer} lookups once per model (manually because get_layer does not access
+    # model._layers) and caches them as long as the layer count is unchanged.
+    layers = _model_layers(model)
+
+    try:
+        cached = _layer_index_cache.get(model)
+    except TypeError:  # model does not support weak references
+        cached = None
+
+    if cached is not None and cached[0] == len(layers):
+        return cached[1], cached[2]
+
+    by_id = {id(layer): layer for layer in layers}
+    by_name = {layer.name: layer for layer in layers}
+    try:
+        _layer_index_cache[model] = (len(layers), by_id, by_name)
+    except TypeError:
+        pass
+    return by_id, by_name
 
 
 def find_layer_by_id(model, _id):
-    layers = []
-    if hasattr(model, '_layers'):
-        layers = model._layers
-    elif hasattr(model, '_self_tracked_trackables'):
-        layers = model._self_tracked_trackables
-    
-    for layer in layers: # manually because get_layer does not access model._layers
-            if id(layer) == _id:
-                return layer
-    return None
+    return _layer_index(model)[0].get(_id)
 
 
 def find_layer_by_name(model, name):
-    layers = []
-    if hasattr(model, '_layers'):
-        layers = model._layers
-    elif hasattr(model, '_self_tracked_trackables'):
-        layers = model._self_tracked_trackables
-    
-    for layer in layers:
-        if layer.name == name:
-            return layer
-    return None
+    return _layer_index(model)[1].get(name)
 
 
-def find_input_layers(model, id_to_num_mapping=None, adj_matrix=None):
-    if adj_matrix is None:
-        id_to_num_mapping, adj_matrix = model_to_adj_matrix(model)
-    for i in np.where(np.sum(adj_matrix, axis=0) == 0)[0]:  # find all nodes with 0 inputs
-        for key in get_keys_by_value(id_to_num_mapping, i):
-            yield find_layer_by_id(model, key)
+def find_input_layers(model, id_to_num_mapping=None, edges=None):
+    if edges is None:
+        id_to_num_mapping, edges = model_to_adj_matrix(model)
+    has_input = {dst for _, dst in edges}
+    num_to_id = {v: k for k, v in id_to_num_mapping.items()}
+    for i in range(len(id_to_num_mapping)):  # find all nodes with 0 inputs
+        if i not in has_input:
+            yield find_layer_by_id(model, num_to_id[i])
 
 
 def find_output_layers(model):
     if hasattr(model, 'output_names'):
         # For older Keras versions (<3)
         for name in model.output_names:
-            yield model.get_layer(name=name)
+            yield find_layer_by_name(model, name)
     else:
         # For newer Keras versions (>=3)
         for output in model.outputs:
@@ -122,78 +193,88 @@ def find_output_layers(model):
                 yield layer
 
 
-def model_to_hierarchy_lists(model, id_to_num_mapping=None, adj_matrix=None):
-    if adj_matrix is None:
-        id_to_num_mapping, adj_matrix = model_to_adj_matrix(model)
-    hierarchy = [set(find_input_layers(model, id_to_num_mapping, adj_matrix))]
-    prev_layers = set(hierarchy[0])
-    finished = False
-
-    while not finished:
-        layer = list()
-        finished = True
-        for start_layer in hierarchy[-1]:
-            start_layer_idx = id_to_num_mapping[id(start_layer)]
-            for end_layer_idx in np.where(adj_matrix[start_layer_idx] > 0)[0]:
-                finished = False
-                for end_layer_id in get_keys_by_value(id_to_num_mapping, end_layer_idx):
-                    end_layer = find_layer_by_id(model, end_layer_id)
-                    incoming_to_end_layer = set(get_incoming_layers(end_layer))
-                    intersection = set(incoming_to_end_layer).intersection(prev_layers)
-                    if len(intersection) == len(incoming_to_end_layer):
-                        if end_layer not in layer:
-                            layer.append(end_layer)
-                            prev_layers.add(end_layer)
-        if not finished:
-            hierarchy.append(layer)
+def model_to_hierarchy_lists(model, id_to_num_mapping=None, edges=None):
+    if edges is None:
+        id_to_num_mapping, edges = model_to_adj_matrix(model)
+    # Kahn-style indegree countdown: every edge is visited exactly once, unlike the previous level-synchronous
+    # rescan that re-checked each candidate's full incoming set per level.
+    num_nodes = len(id_to_num_mapping)
+    successors = dict()
+    indegree = [0] * num_nodes
+    for src, dst in edges:
+        successors.setdefault(src, list()).append(dst)
+        indegree[dst] += 1
+
+    queue = deque(i for i in range(num_nodes) if indegree[i] == 0)
+    level = {i: 0 for i in queue}
+    while queue:
+        node = queue.popleft()
+        for successor in successors.get(node, ()):
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                # Nodes pop in level order, so the last predecessor to finish determines the level
+                level[successor] = level[node] + 1
+                queue.append(successor)
+
+    num_to_id = {v: k for k, v in id_to_num_mapping.items()}
+    hierarchy = [list() for _ in range(max(level.values()) + 1)]
+    for node, node_level in level.items():
+        hierarchy[node_level].append(find_layer_by_id(model, num_to_id[node]))
+    hierarchy[0] = set(hierarchy[0])
 
     return hierarchy
 
 
-def augment_output_layers(model, output_layers, id_to_num_mapping, adj_matrix):
-
-    adj_matrix = np.pad(adj_matrix, ((0, len(output_layers)), (0, len(output_layers))), mode='constant', constant_values=0)
-
+def augment_output_layers(model, output_layers, id_to_num_mapping, edges):
     for dummy_output in output_layers:
-        id_to_num_mapping[id(dummy_output)] = len(id_to_num_mapping.keys())
+        id_to_num_mapping[id(dummy_output)] = len(id_to_num_mapping)
 
     for i, output_layer in enumerate(find_output_layers(model)):
         output_layer_idx = id_to_num_mapping[id(output_layer)]
         dummy_layer_idx = id_to_num_mapping[id(output_layers[i])]
 
-        adj_matrix[output_layer_idx, dummy_layer_idx] += 1
+        edges.append((output_layer_idx, dummy_layer_idx))
 
-    return id_to_num_mapping, adj_matrix
+    return id_to_num_mapping, edges
 
 
-def is_internal_input(layer):
+def _get_input_layer_types():
+    # Resolve the InputLayer classes of whichever keras variants are importable once; the previous per-call imports
+    # were both broken (importing an attribute path raises ImportError) and repeated for every layer. Deferred to
+    # first use so that importing visualkeras does not pull in tensorflow.
+    types = []
     try:
-        import tensorflow.python.keras.engine.input_layer.InputLayer
-        if isinstance(layer, tensorflow.python.keras.engine.input_layer.InputLayer):
-            return True
-    except (ModuleNotFoundError, AttributeError):
+        from tensorflow.python.keras.engine.input_layer import InputLayer
+        types.append(InputLayer)
+    except (ImportError, AttributeError):
         pass
-    
+
     try:
         # From versions Keras 2.13+ the Keras module may store all its code in a src subfolder
-        import tensorflow.python.keras.src.keras.engine.input_layer.InputLayer 
-        if isinstance(layer, tensorflow.python.keras.src.engine.input_layer.InputLayer):
-            return True
-    except (ModuleNotFoundError, AttributeError):
+        from keras.src.engine.input_layer import InputLayer
+        types.append(InputLayer)
+    except (ImportError, AttributeError):
         pass
 
     try:
-        import keras
-        if isinstance(layer, keras.engine.input_layer.InputLayer):
-            return True
-    except (ModuleNotFoundError, AttributeError):
+        from keras.engine.input_layer import InputLayer
+        types.append(InputLayer)
+    except (ImportError, AttributeError):
         pass
 
     try:
-        import keras
-        if isinstance(layer, keras.src.engine.input_layer.InputLayer):
-            return True
-    except (ModuleNotFoundError, AttributeError):
+        from keras.layers import InputLayer
+        types.append(InputLayer)
+    except (ImportError, AttributeError):
         pass
 
-    return False
+    types = tuple(types)
+    globals()['_INPUT_LAYER_TYPES'] = types
+    return types
+
+
+def is_internal_input(layer):
+    input_layer_types = globals().get('_INPUT_LAYER_TYPES')
+    if input_layer_types is None:
+        input_layer_types = _get_input_layer_types()
+    return isinstance(layer, input_layer_types)
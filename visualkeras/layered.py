@@ -1,23 +1,141 @@
 from typing import Callable
+from collections import namedtuple
 import aggdraw
 from PIL import ImageFont
 from math import ceil
 from .utils import *
+from .utils import _get_default_font, _get_pen
 from .layer_utils import *
+from . import layer_utils
 import warnings
 
-try:
-    from tensorflow.keras import layers
-except:
-    try:
-        from tensorflow.python.keras import layers
-    except:
-        try:
-            from keras import layers
-        except:
-            warnings.warn("Could not import the 'layers' module from Keras. text_callable will not work.")
-
-def layered_view(model, 
+_LayerRecord = namedtuple('_LayerRecord', ['index', 'layer', 'cls', 'size', 'dimensions', 'spacing'])
+
+
+def _clamp(value, lo, hi):
+    # Inline compare chain instead of the min(max(...)) call pair
+    return lo if value < lo else (hi if value > hi else value)
+
+
+def _calculate_layer_dimensions(shape: tuple, min_z: int, min_xy: int, max_z: int, max_xy: int,
+                                scale_z: float, scale_xy: float, one_dim_orientation: str) -> tuple:
+    """
+    Computes the clamped (x, y, z) pixel size for a single layer output shape.
+
+    :param shape: Output shape of the layer without nesting (batch dimension first).
+    :return: Tuple of (x, y, z) sizes in pixel.
+    """
+    x = min_xy
+    y = min_xy
+    z = min_z
+
+    if len(shape) >= 4:
+        x = _clamp(shape[1] * scale_xy, x, max_xy)
+        y = _clamp(shape[2] * scale_xy, y, max_xy)
+        z = _clamp(self_multiply(shape[3:]) * scale_z, z, max_z)
+    elif len(shape) == 3:
+        x = _clamp(shape[1] * scale_xy, x, max_xy)
+        y = _clamp(shape[2] * scale_xy, y, max_xy)
+        z = _clamp(self_multiply(shape[2:]) * scale_z, z, max_z)
+    elif len(shape) == 2:
+        if one_dim_orientation == 'x':
+            x = _clamp(shape[1] * scale_xy, x, max_xy)
+        elif one_dim_orientation == 'y':
+            y = _clamp(shape[1] * scale_xy, y, max_xy)
+        elif one_dim_orientation == 'z':
+            z = _clamp(shape[1] * scale_z, z, max_z)
+        else:
+            raise ValueError(f"unsupported orientation {one_dim_orientation}")
+    else:
+        raise RuntimeError(f"not supported tensor shape {shape}")
+
+    return x, y, z
+
+
+def _extract_primary_shape(output_shape) -> tuple:
+    """
+    Normalizes a layer output shape to a flat tuple, dropping the single-element list nesting of non-sequential
+    models. Exact type checks come first, since Keras hands out plain tuples and lists.
+
+    :param output_shape: Output shape as reported by the layer.
+    :return: The shape as a flat tuple.
+    """
+    shape_type = type(output_shape)
+    if shape_type is tuple:
+        return output_shape
+    if shape_type is list and len(output_shape) == 1:
+        return output_shape[0]
+    # Fall back to isinstance so tuple/list subclasses keep working
+    if isinstance(output_shape, tuple):
+        return output_shape
+    if isinstance(output_shape, list) and len(output_shape) == 1:
+        return output_shape[0]
+    raise RuntimeError(f"not supported tensor shape {output_shape}")
+
+
+def _build_layer_ir(model, min_z: int = 20, min_xy: int = 20, max_z: int = 400, max_xy: int = 2000,
+                    scale_z: float = 0.1, scale_xy: float = 4, type_ignore: list = None, index_ignore: list = None,
+                    one_dim_orientation: str = 'z') -> list:
+    """
+    Walks a keras model and computes the per-layer geometry needed by :func:`layered_view`. The result is a list of
+    `_LayerRecord` namedtuples holding the layer, its class, the scaled (x, y, z) size in pixel and the dimension
+    strings for the legend. Spacing dummy layers are kept as records with their spacing set and no size. The list can
+    be passed to repeated `layered_view` calls via the `layer_ir` parameter to avoid re-walking the model, as long as
+    the scaling and ignore parameters match.
+
+    :param model: A keras model that will be traversed.
+    :param min_z: Minimum z size in pixel a layer will have.
+    :param min_xy: Minimum x and y size in pixel a layer will have.
+    :param max_z: Maximum z size in pixel a layer will have.
+    :param max_xy: Maximum x and y size in pixel a layer will have.
+    :param scale_z: Scalar multiplier for the z size of each layer.
+    :param scale_xy: Scalar multiplier for the x and y size of each layer.
+    :param type_ignore: List of layer types in the keras model to ignore during drawing.
+    :param index_ignore: List of layer indexes in the keras model to ignore during drawing.
+    :param one_dim_orientation: Axis on which one dimensional layers should be drawn. Can  be 'x', 'y' or 'z'.
+
+    :return: List of `_LayerRecord` namedtuples.
+    """
+    # frozenset gives O(1) membership tests in the loop below
+    type_ignore = frozenset(type_ignore or ())
+    index_ignore = frozenset(index_ignore or ())
+
+    records = list()
+
+    for index, layer in enumerate(model.layers):
+
+        # Ignore layers that the user has opted out to
+        if type(layer) in type_ignore or index in index_ignore:
+            continue
+
+        # Do not compute a size for the SpacingDummyLayer, just record its spacing
+        if type(layer) == layer_utils.SpacingDummyLayer:
+            records.append(_LayerRecord(index, layer, type(layer), None, None, layer.spacing))
+            continue
+
+        # hasattr would evaluate the output_shape property (and its node-graph walk) a second time, so fetch it once
+        output_shape = getattr(layer, 'output_shape', None)
+        if output_shape is None:
+            output_shape = layer.output.shape
+
+        shape = _extract_primary_shape(output_shape)
+
+        x, y, z = _calculate_layer_dimensions(shape, min_z, min_xy, max_z, max_xy, scale_z, scale_xy,
+                                              one_dim_orientation)
+
+        dimension_string = str(shape)
+        dimension_string = dimension_string[1:len(dimension_string) - 1].split(", ")
+        dimension = []
+        for i in range(0, len(dimension_string)):
+            if dimension_string[i].isnumeric():
+                dimension.append(dimension_string[i])
+
+        records.append(_LayerRecord(index, layer, type(layer), (x, y, z), dimension, None))
+
+    return records
+
+
+def layered_view(model,
                  to_file: str = None, 
                  min_z: int = 20, 
                  min_xy: int = 20, 
@@ -34,16 +152,18 @@ def layered_view(model,
                  draw_volume: bool = True,
                  draw_reversed: bool = False, 
                  padding: int = 10,
-                 text_callable: Callable[[int, layers.Layer], tuple] = None,
+                 text_callable: Callable[[int, Any], tuple] = None,
                  text_vspacing: int = 4,
                  spacing: int = 10, 
                  draw_funnel: bool = True, 
                  shade_step=10, 
                  legend: bool = False,
                  legend_text_spacing_offset = 15,
-                 font: ImageFont = None, 
-                 font_color: Any = 'black', 
-                 show_dimension=False) -> Image:
+                 font: ImageFont = None,
+                 font_color: Any = 'black',
+                 show_dimension=False,
+                 layer_ir: list = None,
+                 png_compress_level: int = None) -> Image:
     """
     Generates a architecture visualization for a given linear keras model (i.e. one input and output tensor for each
     layer) in layered style (great for CNN).
@@ -75,6 +195,8 @@ def layered_view(model,
     :param font: Font that will be used for the legend. Leaving this set to None, will use the default font.
     :param font_color: Color for the font if used. Can be str or (R,G,B,A).
     :param show_dimension: If legend is set to True and this is set to True, the dimensions of the layers will be shown in the legend.
+    :param layer_ir: Precomputed layer geometry as returned by `_build_layer_ir`. Allows sharing the model traversal between repeated calls that use the same scaling and ignore parameters. If None, the geometry is computed from the model.
+    :param png_compress_level: zlib compression level (0-9) used when writing a png to to_file. Lower values trade file size for a much faster encode. If None, the PIL default is used.
 
 
     :return: Generated architecture image.
@@ -88,6 +210,7 @@ def layered_view(model,
     boxes = list()
     layer_y = list()
     color_wheel = ColorWheel()
+    color_table = dict()
     current_z = padding
     x_off = -1
 
@@ -97,77 +220,33 @@ def layered_view(model,
     img_height = 0
     max_right = 0
 
-    if type_ignore is None:
-        type_ignore = list()
-
-    if index_ignore is None:
-        index_ignore = list()
-
     if color_map is None:
         color_map = dict()
 
-    for index, layer in enumerate(model.layers):
+    if layer_ir is None:
+        layer_ir = _build_layer_ir(model, min_z=min_z, min_xy=min_xy, max_z=max_z, max_xy=max_xy, scale_z=scale_z,
+                                   scale_xy=scale_xy, type_ignore=type_ignore, index_ignore=index_ignore,
+                                   one_dim_orientation=one_dim_orientation)
 
-        # Ignore layers that the use has opted out to
-        if type(layer) in type_ignore or index in index_ignore:
-            continue
+    for record in layer_ir:
 
         # Do no render the SpacingDummyLayer, just increase the pointer
-        if type(layer) == SpacingDummyLayer:
-            current_z += layer.spacing
+        if record.spacing is not None:
+            current_z += record.spacing
             continue
 
-        layer_type = type(layer)
+        index = record.index
+        layer_type = record.cls
 
         if legend and show_dimension:
             layer_types.append(layer_type)
         elif layer_type not in layer_types:
             layer_types.append(layer_type)
 
-        x = min_xy
-        y = min_xy
-        z = min_z
+        x, y, z = record.size
 
-        if hasattr(layer, 'output_shape'):
-            output_shape = layer.output_shape
-        else:
-            output_shape = layer.output.shape
-
-        if isinstance(output_shape, tuple):
-            shape = output_shape
-        elif isinstance(output_shape, list) and len(output_shape) == 1:  # drop dimension for non seq. models
-            shape = output_shape[0]
-        else:
-            raise RuntimeError(f"not supported tensor shape {output_shape}")
-
-        if len(shape) >= 4:
-            x = min(max(shape[1] * scale_xy, x), max_xy)
-            y = min(max(shape[2] * scale_xy, y), max_xy)
-            z = min(max(self_multiply(shape[3:]) * scale_z, z), max_z)
-        elif len(shape) == 3:
-            x = min(max(shape[1] * scale_xy, x), max_xy)
-            y = min(max(shape[2] * scale_xy, y), max_xy)
-            z = min(max(self_multiply(shape[2:]) * scale_z, z), max_z)
-        elif len(shape) == 2:
-            if one_dim_orientation == 'x':
-                x = min(max(shape[1] * scale_xy, x), max_xy)
-            elif one_dim_orientation == 'y':
-                y = min(max(shape[1] * scale_xy, y), max_xy)
-            elif one_dim_orientation == 'z':
-                z = min(max(shape[1] * scale_z, z), max_z)
-            else:
-                raise ValueError(f"unsupported orientation {one_dim_orientation}")
-        else:
-            raise RuntimeError(f"not supported tensor shape {layer.output_shape}")
-        
         if legend and show_dimension:
-            dimension_string = str(shape)
-            dimension_string = dimension_string[1:len(dimension_string)-1].split(", ")
-            dimension = []
-            for i in range(0, len(dimension_string)):
-                if dimension_string[i].isnumeric():
-                    dimension.append(dimension_string[i])
-            dimension_list.append(dimension)
+            dimension_list.append(record.dimensions)
 
         box = Box()
 
@@ -186,24 +265,27 @@ def layered_view(model,
         box.x2 = box.x1 + z
         box.y2 = box.y1 + y
 
-        box.fill = color_map.get(layer_type, {}).get('fill', color_wheel.get_color(layer_type))
-        box.outline = color_map.get(layer_type, {}).get('outline', 'black')
-        color_map[layer_type] = {'fill': box.fill, 'outline': box.outline}
+        # Resolve fill and outline once per layer type instead of two chained dict lookups per layer
+        colors = color_table.get(layer_type)
+        if colors is None:
+            entry = color_map.get(layer_type, {})
+            colors = (get_rgba_tuple(entry.get('fill', color_wheel.get_color(layer_type))),
+                      get_rgba_tuple(entry.get('outline', 'black')))
+            color_table[layer_type] = colors
+            color_map[layer_type] = {'fill': colors[0], 'outline': colors[1]}
+        box.fill, box.outline = colors
 
         box.shade = shade_step
         boxes.append(box)
         layer_y.append(box.y2 - (box.y1 - box.de))
 
-        # Update image bounds
-        hh = box.y2 - (box.y1 - box.de)
-        if hh > img_height:
-            img_height = hh
-
-        if box.x2 + box.de > max_right:
-            max_right = box.x2 + box.de
-
         current_z += z + spacing
 
+    # Compute the image bounds in one pass over the collected geometry instead of per-iteration bookkeeping
+    if boxes:
+        img_height = max(layer_y)
+        max_right = max(box.x2 + box.de for box in boxes)
+
     # Generate image
     img_width = max_right + x_off + padding
 
@@ -212,28 +294,35 @@ def layered_view(model,
     is_any_text_below = False
     max_box_with_text_height=0
     max_box_height = 0
+    text_infos = list()
     if text_callable is not None:
         if font is None:
-            font = ImageFont.load_default()
+            font = _get_default_font()
+
+        if hasattr(font, 'getsize'):
+            _measure_line = font.getsize
+        else:
+            def _measure_line(line):
+                bbox = font.getbbox(line)
+                return bbox[2], bbox[3]
+
         i = -1
-        for index, layer in enumerate(model.layers):
-            if type(layer) in type_ignore or type(layer) == SpacingDummyLayer or index in index_ignore:
+        for record in layer_ir:
+            if record.spacing is not None:
                 continue
             i += 1
-            text, above = text_callable(i, layer)
+            text, above = text_callable(i, record.layer)
             if above:
                 is_any_text_above = True
             else:
                 is_any_text_below = True
-            
-            text_height = 0
-            for line in text.split('\n'):
-                if hasattr(font, 'getsize'):
-                    line_height = font.getsize(line)[1]
-                else:
-                    line_height = font.getbbox(line)[3]
-                text_height += line_height
-            text_height += (len(text.split('\n'))-1)*text_vspacing
+
+            lines = text.split('\n')
+            sizes = [_measure_line(line) for line in lines]
+            text_height = sum(size[1] for size in sizes) + (len(lines) - 1) * text_vspacing
+            # Texts and measurements are kept for the draw pass, so the callable and font run only once per layer
+            text_infos.append((text, above, text_height, max(size[0] for size in sizes)))
+
             box_height = abs(boxes[i].y2-boxes[i].y1)-boxes[i].de
             box_with_text_height = box_height + text_height
             if box_with_text_height > max_box_with_text_height:
@@ -241,29 +330,26 @@ def layered_view(model,
             if box_height > max_box_height:
                 max_box_height = box_height
     
+    # Reserve extra height for the text before centering, so that the canvas is only allocated once
+    text_height_adjust = abs(max_box_height - max_box_with_text_height)
+    centering_height = img_height
     if is_any_text_above:
-        img_height += abs(max_box_height - max_box_with_text_height)*2
-    
+        centering_height += 2 * text_height_adjust
+        img_height += text_height_adjust
+    if is_any_text_below:
+        img_height += text_height_adjust
+
     img = Image.new('RGBA', (int(ceil(img_width)), int(ceil(img_height))), background_fill)
 
     # x, y correction (centering)
     for i, node in enumerate(boxes):
-        y_off = (img.height - layer_y[i]) / 2
+        y_off = (int(ceil(centering_height)) - layer_y[i]) / 2
         node.y1 += y_off
         node.y2 += y_off
 
         node.x1 += x_off
         node.x2 += x_off
-    
 
-    
-    if is_any_text_above:
-        img_height -= abs(max_box_height - max_box_with_text_height)
-        img = Image.new('RGBA', (int(ceil(img_width)), int(ceil(img_height))), background_fill)
-    if is_any_text_below:
-        img_height += abs(max_box_height - max_box_with_text_height)
-        img = Image.new('RGBA', (int(ceil(img_width)), int(ceil(img_height))), background_fill)
-    
     draw = aggdraw.Draw(img)
 
     # Correct x positions of reversed boxes
@@ -280,7 +366,7 @@ def layered_view(model,
 
     if draw_reversed:
         for box in boxes:
-            pen = aggdraw.Pen(get_rgba_tuple(box.outline))
+            pen = _get_pen(box.outline)
 
             if last_box is not None and draw_funnel:
                 # Top connection back
@@ -295,7 +381,7 @@ def layered_view(model,
         last_box = None
 
         for box in reversed(boxes):
-            pen = aggdraw.Pen(get_rgba_tuple(box.outline))
+            pen = _get_pen(box.outline)
 
             if last_box is not None and draw_funnel:
                 # Top connection front
@@ -311,7 +397,7 @@ def layered_view(model,
             last_box = box
     else:
         for box in boxes:
-            pen = aggdraw.Pen(get_rgba_tuple(box.outline))
+            pen = _get_pen(box.outline)
 
             if last_box is not None and draw_funnel:
                 draw.line([last_box.x2 + last_box.de, last_box.y1 - last_box.de,
@@ -333,49 +419,24 @@ def layered_view(model,
 
     if text_callable is not None:
         draw_text = ImageDraw.Draw(img)
-        i = -1
-        for index, layer in enumerate(model.layers):
-            if type(layer) in type_ignore or type(layer) == SpacingDummyLayer or index in index_ignore:
-                continue
-            i += 1
-            text, above = text_callable(i, layer)
-            text_height = 0
-            text_x_adjust = []
-            for line in text.split('\n'):
-                if hasattr(font, 'getsize'):
-                    line_height = font.getsize(line)[1]
-                else:
-                    line_height = font.getbbox(line)[3]
-                
-                text_height += line_height
-
-                if hasattr(font, 'getsize'):
-                    text_x_adjust.append(font.getsize(line)[0])
-                else:
-                    text_x_adjust.append(font.getbbox(line)[2])
-            text_height += (len(text.split('\n'))-1)*text_vspacing
-
+        for i, (text, above, text_height, text_width) in enumerate(text_infos):
             box = boxes[i]
             text_x = box.x1 + (box.x2 - box.x1) / 2
             text_y = box.y2
             if above:
                 text_x = box.x1 + box.de + (box.x2 - box.x1) / 2
                 text_y = box.y1 - box.de - text_height
-            
-            text_x -= max(text_x_adjust)/2  # Shift text to the left by half of the text width, so that it is centered
+
+            text_x -= text_width / 2  # Shift text to the left by half of the text width, so that it is centered
             # Centering with middle text anchor 'm' does not work with align center
-            anchor = 'la'
-            if above:
-                anchor = 'la'
-        
             draw_text.multiline_text((text_x, text_y), text, font=font, fill=font_color,
-                                     anchor=anchor, align='center',
+                                     anchor='la', align='center',
                                      spacing=text_vspacing)
 
     # Create layer color legend
     if legend:
         if font is None:
-            font = ImageFont.load_default()
+            font = _get_default_font()
 
         if hasattr(font, 'getsize'):
             text_height = font.getsize("Ag")[1]
@@ -441,6 +502,9 @@ def layered_view(model,
         img = vertical_image_concat(img, legend_image, background_fill=background_fill)
 
     if to_file is not None:
-        img.save(to_file)
+        if png_compress_level is not None and to_file.lower().endswith('.png'):
+            img.save(to_file, compress_level=png_compress_level)
+        else:
+            img.save(to_file)
 
     return img
@@ -1,8 +1,20 @@
+import functools
+from math import prod
 from typing import Any
-from PIL import ImageColor, ImageDraw, Image
+from PIL import ImageColor, ImageDraw, ImageFont, Image
 import aggdraw
 
 
+@functools.lru_cache(maxsize=None)
+def _get_pen(color: tuple, width: int = 1) -> aggdraw.Pen:
+    return aggdraw.Pen(color, width)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_brush(color: tuple) -> aggdraw.Brush:
+    return aggdraw.Brush(color)
+
+
 class RectShape:
     x1: int
     x2: int
@@ -28,9 +40,7 @@ class RectShape:
         self._outline = get_rgba_tuple(v)
 
     def _get_pen_brush(self):
-        pen = aggdraw.Pen(self._outline)
-        brush = aggdraw.Brush(self._fill)
-        return pen, brush
+        return _get_pen(self._outline), _get_brush(self._fill)
 
 
 class Box(RectShape):
@@ -41,8 +51,8 @@ class Box(RectShape):
         pen, brush = self._get_pen_brush()
 
         if hasattr(self, 'de') and self.de > 0:
-            brush_s1 = aggdraw.Brush(fade_color(self.fill, self.shade))
-            brush_s2 = aggdraw.Brush(fade_color(self.fill, 2 * self.shade))
+            brush_s1 = _get_brush(fade_color(self.fill, self.shade))
+            brush_s2 = _get_brush(fade_color(self.fill, 2 * self.shade))
 
             if draw_reversed:
                 draw.line([self.x2 - self.de, self.y1 - self.de, self.x2 - self.de, self.y2 - self.de], pen)
@@ -105,12 +115,30 @@ class ColorWheel:
         self.colors = colors if colors is not None else ["#ffd166", "#ef476f", "#118ab2", "#073b4c", "#842da1", "#ffbad4", "#fe9775", "#83d483", "#06d6a0", "#0cb0a9"]
 
     def get_color(self, class_type: type):
-        if class_type not in self._cache.keys():
-            index = len(self._cache.keys()) % len(self.colors)
+        if class_type not in self._cache:
+            index = len(self._cache) % len(self.colors)
             self._cache[class_type] = self.colors[index]
         return self._cache.get(class_type)
 
 
+@functools.lru_cache(maxsize=32)
+def get_font(path: str, size: int) -> ImageFont:
+    """
+    Loads a truetype font and caches it, so that repeated renders do not re-parse the font file.
+
+    :param path: Path to the font file.
+    :param size: Requested font size in points.
+    :return: The loaded ImageFont.
+    """
+    return ImageFont.truetype(path, size)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_default_font() -> ImageFont:
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=None)
 def fade_color(color: tuple, fade_amount: int) -> tuple:
     r = max(0, color[0] - fade_amount)
     g = max(0, color[1] - fade_amount)
@@ -118,6 +146,7 @@ def fade_color(color: tuple, fade_amount: int) -> tuple:
     return r, g, b, color[3]
 
 
+@functools.lru_cache(maxsize=None)
 def get_rgba_tuple(color: Any) -> tuple:
     """
 
@@ -148,15 +177,10 @@ def self_multiply(tensor_tuple: tuple):
     :param tensor_tuple:
     :return:
     """
-    tensor_list = list(tensor_tuple)
-    if None in tensor_list:
-        tensor_list.remove(None)
+    tensor_list = [t for t in tensor_tuple if t is not None]
     if len(tensor_list) == 0:
         return 0
-    s = tensor_list[0]
-    for i in range(1, len(tensor_list)):
-        s *= tensor_list[i]
-    return s
+    return prod(tensor_list)
 
 
 def vertical_image_concat(im1: Image, im2: Image, background_fill: Any = 'white'):